@@ -1,13 +1,22 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import asyncio
 import base64
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 from mediapipe import solutions as mp
-from pathlib import Path
-import json
 
-app = FastAPI()
+try:
+    from . import templates as template_store
+except ImportError:  # run as "uvicorn main:app" from the backend directory
+    import templates as template_store
+
+app = FastAPI(default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -15,53 +24,122 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-mp_pose = mp.pose.Pose()
+# Stream-tuned tracker for /predict: detects once, then tracks from the
+# previous frame's landmarks, skipping the person detector on most frames.
+mp_pose = mp.pose.Pose(
+    static_image_mode=False,
+    model_complexity=0,
+    smooth_landmarks=False,
+    enable_segmentation=False,
+    smooth_segmentation=False,
+    min_detection_confidence=0.5,
+    min_tracking_confidence=0.5,
+)
 
-DATA_DIR = Path(__file__).parent / "data"
-SIGN_LANDMARKS = {}
+# Separate instance for independent single-shot images, where tracking
+# state from unrelated frames would only hurt.
+mp_pose_static = mp.pose.Pose(
+    static_image_mode=True,
+    model_complexity=0,
+    enable_segmentation=False,
+    min_detection_confidence=0.5,
+)
 
 
-def load_landmark_templates():
-    for json_file in DATA_DIR.glob("*_landmarks.json"):
-        with json_file.open(encoding="utf-8") as f:
-            payload = json.load(f)
-            alias = payload.get("alias") or payload.get("sign")
-            SIGN_LANDMARKS[alias.lower()] = payload
+# Resolve the PoseLandmark enum members to plain ints once; attribute
+# lookups on the enum cost a surprising amount on a per-frame path.
+NOSE_IDX = int(mp.pose.PoseLandmark.NOSE)
+LEFT_WRIST_IDX = int(mp.pose.PoseLandmark.LEFT_WRIST)
+RIGHT_WRIST_IDX = int(mp.pose.PoseLandmark.RIGHT_WRIST)
 
+# Indexed by (left_up << 1) | right_up.
+_MESSAGES = (
+    None,
+    "오른손을 들어 인사했어요.",
+    "왼손을 들어 인사했어요.",
+    "양손을 들어 환영 인사를 하고 있어요.",
+)
 
-def detect_gestures(landmarks):
-    """Return a simple string based on wrist positions."""
-    nose_y = landmarks[mp.pose.PoseLandmark.NOSE].y
-    left_wrist = landmarks[mp.pose.PoseLandmark.LEFT_WRIST]
-    right_wrist = landmarks[mp.pose.PoseLandmark.RIGHT_WRIST]
 
+NUM_POSE_LANDMARKS = 33
+
+
+def detect_gestures(landmarks: np.ndarray):
+    """Return a simple string based on wrist positions in a (33, 4) x/y/z/visibility array."""
     # Allow small margin above/below nose and lower the visibility constraint to make detection easier.
     margin = 0.15  # allow larger vertical tolerance
     visibility_threshold = 0.2  # accept lower visibility
 
-    left_up = (left_wrist.y < nose_y + margin) and (left_wrist.visibility > visibility_threshold)
-    right_up = (right_wrist.y < nose_y + margin) and (right_wrist.visibility > visibility_threshold)
+    # No usable nose means no usable reference line; bail before touching
+    # the wrists at all (common for frames with an empty background).
+    if landmarks[NOSE_IDX, 3] < visibility_threshold:
+        return None
 
-    if left_up and right_up:
-        return "양손을 들어 환영 인사를 하고 있어요."
-    if left_up:
-        return "왼손을 들어 인사했어요."
-    if right_up:
-        return "오른손을 들어 인사했어요."
+    nose_y = landmarks[NOSE_IDX, 1]
+    left_wrist = landmarks[LEFT_WRIST_IDX]
+    right_wrist = landmarks[RIGHT_WRIST_IDX]
 
-    return None
+    left_up = (left_wrist[1] < nose_y + margin) and (left_wrist[3] > visibility_threshold)
+    right_up = (right_wrist[1] < nose_y + margin) and (right_wrist[3] > visibility_threshold)
 
+    return _MESSAGES[(left_up << 1) | right_up]
 
-@app.post("/predict")
-async def predict(request: Request):
-    body = await request.json()
-    img_data = base64.b64decode(body["image"])
+
+# The decode + inference pipeline runs on this pool so the event loop stays
+# free for other requests; OpenCV and MediaPipe release the GIL in their
+# C++ cores, so worker threads scale across cores.
+_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Reused per-thread destination for the BGR->RGB conversion, so the
+# per-frame H x W x 3 copy does not also pay a malloc per request.
+_thread_bufs = threading.local()
+
+# A MediaPipe graph must not run concurrently with itself; one lock per
+# Pose instance serializes process() without coupling the two routes.
+_pose_locks = {id(mp_pose): threading.Lock(), id(mp_pose_static): threading.Lock()}
+
+
+def _pose_to_array(landmark_list) -> np.ndarray:
+    """
+    Copy the 33 pose landmarks into a reused per-thread (33, 4) float32
+    buffer in one pass. Everything downstream then slices the array instead
+    of going back through a protobuf accessor per attribute.
+    """
+    buf = getattr(_thread_bufs, "pose_buf", None)
+    if buf is None:
+        buf = _thread_bufs.pose_buf = np.empty((NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+    for idx, lm in enumerate(landmark_list):
+        buf[idx] = (lm.x, lm.y, lm.z, lm.visibility)
+    return buf
+
+
+def _to_rgb(frame):
+    rgb_buf = getattr(_thread_bufs, "rgb_buf", None)
+    if rgb_buf is None or rgb_buf.shape != frame.shape:
+        rgb_buf = _thread_bufs.rgb_buf = np.empty_like(frame)
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+    return rgb_buf
+
+
+# MediaPipe resizes to 256x256 internally anyway, so shrink large client
+# frames first and keep the cvtColor + model-upload copies proportional to
+# the smaller pixel count.
+INFERENCE_SIZE = 256
+
+
+def _run_pipeline(img_data: bytes, pose):
     np_arr = np.frombuffer(img_data, np.uint8)
     frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
 
-    results = mp_pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    h, w = frame.shape[:2]
+    scale = INFERENCE_SIZE / max(h, w)
+    if scale < 1:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    with _pose_locks[id(pose)]:
+        results = pose.process(_to_rgb(frame))
     if results.pose_landmarks:
-        message = detect_gestures(results.pose_landmarks.landmark)
+        message = detect_gestures(_pose_to_array(results.pose_landmarks.landmark))
         if message:
             return {"text": message}
         return {"text": "안녕하세요 배부르네요"}
@@ -69,11 +147,85 @@ async def predict(request: Request):
     return {"text": "안녕하세요 배부르네요"}
 
 
+async def _read_frame(request: Request) -> bytes:
+    """
+    Raw JPEG bytes for application/octet-stream clients; the legacy JSON
+    envelope with a base64 "image" field is still accepted, paying its
+    ~33% inflation plus a decode pass.
+    """
+    if request.headers.get("content-type", "").startswith("application/json"):
+        body = await request.json()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_POOL, base64.b64decode, body["image"])
+    return await request.body()
+
+
+async def _predict_with(request: Request, pose):
+    img_data = await _read_frame(request)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_POOL, _run_pipeline, img_data, pose)
+
+
+# A live-stream client gains nothing from us inferring frames it has already
+# replaced: keep at most one pending frame per client and let newer frames
+# push stale ones out, so end-to-end latency stays bounded by one inference.
+_sessions: dict = {}
+
+
+def _session_id(request: Request) -> str:
+    return request.headers.get("x-session-id") or (request.client.host if request.client else "default")
+
+
+async def _session_loop(state):
+    loop = asyncio.get_running_loop()
+    while True:
+        img_data, future = await state["queue"].get()
+        try:
+            result = await loop.run_in_executor(_POOL, _run_pipeline, img_data, mp_pose)
+            state["last"] = result
+            if not future.done():
+                future.set_result(result)
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+
+
+@app.post("/predict")
+async def predict(request: Request):
+    img_data = await _read_frame(request)
+    sid = _session_id(request)
+    state = _sessions.get(sid)
+    if state is None:
+        state = _sessions[sid] = {
+            "queue": asyncio.Queue(maxsize=1),
+            "last": {"text": "안녕하세요 배부르네요"},
+        }
+        state["task"] = asyncio.create_task(_session_loop(state))
+
+    future = asyncio.get_running_loop().create_future()
+    while True:
+        try:
+            state["queue"].put_nowait((img_data, future))
+            break
+        except asyncio.QueueFull:
+            # Drop the stale frame; answer it with the session's last result.
+            try:
+                _, stale_future = state["queue"].get_nowait()
+            except asyncio.QueueEmpty:
+                continue
+            if not stale_future.done():
+                stale_future.set_result(dict(state["last"]))
+    return await future
+
+
+@app.post("/predict_static")
+async def predict_static(request: Request):
+    return await _predict_with(request, mp_pose_static)
+
+
 @app.get("/landmarks/{sign}")
 async def get_sign_landmarks(sign: str):
-    if not SIGN_LANDMARKS:
-        load_landmark_templates()
-    payload = SIGN_LANDMARKS.get(sign.lower())
+    payload = template_store.get_payload(sign)
     if not payload:
         raise HTTPException(status_code=404, detail="Sign landmarks not found.")
     return payload
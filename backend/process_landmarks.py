@@ -16,30 +16,140 @@ This will:
 from __future__ import annotations
 
 import argparse
-import json
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List
 
 import cv2
 import mediapipe as mp
 import numpy as np
+import orjson
+
+try:
+    from . import templates as template_store
+except ImportError:  # run as a plain script from the backend directory
+    import templates as template_store
 
 DATA_DIR = Path(__file__).parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
+NUM_HAND_LANDMARKS = 21
+
+
+class FrameBuffer:
+    """
+    Growable (F, 21, 3) float32 store for per-frame hand landmarks.
+
+    The landmark id lives implicitly in the second axis, so a frame costs
+    one array row instead of 21 boxed dicts, and every downstream consumer
+    (averaging, the JSON frame sample, the template pack) can work on the
+    array view directly.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self._xyz = np.empty((max(capacity, 1), NUM_HAND_LANDMARKS, 3), dtype=np.float32)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, landmarks) -> None:
+        """Append one frame from an iterable of MediaPipe landmark objects."""
+        if self._count == len(self._xyz):
+            self._xyz = np.concatenate([self._xyz, np.empty_like(self._xyz)])
+        row = self._xyz[self._count]
+        for idx, lm in enumerate(landmarks):
+            row[idx] = (lm.x, lm.y, lm.z)
+        self._count += 1
+
+    @property
+    def xyz(self) -> np.ndarray:
+        """The filled (F, 21, 3) view."""
+        return self._xyz[:self._count]
+
+
+class VideoCaptureThreading:
+    """
+    cv2.VideoCapture wrapper that decodes frames on a background thread.
+
+    cap.read() otherwise blocks on codec (or HTTP, for dictionary URLs)
+    decode while MediaPipe sits idle; a small bounded queue lets the next
+    frame decode while the current one is processed. The queue blocks the
+    reader when full instead of dropping, so every frame is still seen.
+    """
+
+    def __init__(self, source: str, queue_size: int = 2):
+        self._cap = cv2.VideoCapture(source)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stopped = False
+        self._ended = False
+        self._thread: threading.Thread | None = None
+        if self._cap.isOpened():
+            self._thread = threading.Thread(target=self._reader, daemon=True)
+            self._thread.start()
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def get(self, prop) -> float:
+        return self._cap.get(prop)
+
+    def _reader(self) -> None:
+        while not self._stopped:
+            ret, frame = self._cap.read()
+            while not self._stopped:
+                try:
+                    self._queue.put((ret, frame), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if not ret:
+                break
 
-def extract_landmarks(video_url: str, max_frames: int | None = None) -> List[List[Dict[str, float]]]:
-    cap = cv2.VideoCapture(video_url)
+    def read(self):
+        if self._thread is None or self._ended:
+            return False, None
+        ret, frame = self._queue.get()
+        if not ret:
+            self._ended = True
+        return ret, frame
+
+    def release(self) -> None:
+        self._stopped = True
+        # Unblock a reader waiting on a full queue before joining it.
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self._cap.release()
+
+
+def extract_landmarks(video_url: str, max_frames: int | None = None, preview: bool = False) -> np.ndarray:
+    cap = VideoCaptureThreading(video_url)
     if not cap.isOpened():
         raise RuntimeError(f"Could not open video source: {video_url}")
 
+    # Frames arrive in temporal order, so run as a tracker: the palm
+    # detector only fires on low-confidence frames and the lite model
+    # handles the rest.
     hands = mp.solutions.hands.Hands(
+        static_image_mode=False,
+        model_complexity=0,
         max_num_hands=1,
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5,
     )
 
-    frames: List[List[Dict[str, float]]] = []
+    # Landmarks accumulate in a float32 frame buffer; dicts are only built
+    # at save time.
+    capacity = max_frames or max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0) or 256
+    buffer = FrameBuffer(capacity)
     frame_count = 0
 
     try:
@@ -53,76 +163,195 @@ def extract_landmarks(video_url: str, max_frames: int | None = None) -> List[Lis
             results = hands.process(rgb)
 
             if results.multi_hand_landmarks:
-                frame_landmarks: List[Dict[str, float]] = []
-                for idx, lm in enumerate(results.multi_hand_landmarks[0].landmark):
-                    frame_landmarks.append({"id": idx, "x": lm.x, "y": lm.y, "z": lm.z})
-                    cv2.circle(frame, (int(lm.x * w), int(lm.y * h)), 3, (0, 255, 0), -1)
-
-                frames.append(frame_landmarks)
+                landmarks = results.multi_hand_landmarks[0].landmark
+                buffer.append(landmarks)
+                if preview:
+                    for lm in landmarks:
+                        cv2.circle(frame, (int(lm.x * w), int(lm.y * h)), 3, (0, 255, 0), -1)
 
             frame_count += 1
             if max_frames and frame_count >= max_frames:
                 break
 
-            cv2.imshow("Sign capture preview", frame)
-            if cv2.waitKey(10) & 0xFF == 27:
-                break
+            # Rendering caps throughput at the 10 ms waitKey floor plus draw
+            # cost, so the batch path skips it entirely.
+            if preview:
+                cv2.imshow("Sign capture preview", frame)
+                if cv2.waitKey(10) & 0xFF == 27:
+                    break
+    finally:
+        cap.release()
+        if preview:
+            cv2.destroyAllWindows()
+
+    return buffer.xyz
+
+
+# One Hands instance per pool worker, created lazily after fork so each
+# process amortizes graph construction across its share of the frames.
+_WORKER_HANDS = None
+
+
+def _worker_process_frame(rgb: np.ndarray) -> np.ndarray | None:
+    global _WORKER_HANDS
+    if _WORKER_HANDS is None:
+        # ex.map hands each worker consecutive runs of frames, so tracking
+        # mode still lets the palm detector skip within a worker's chunk.
+        _WORKER_HANDS = mp.solutions.hands.Hands(
+            static_image_mode=False,
+            model_complexity=0,
+            max_num_hands=1,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+        )
+    results = _WORKER_HANDS.process(rgb)
+    if not results.multi_hand_landmarks:
+        return None
+    return np.array(
+        [(lm.x, lm.y, lm.z) for lm in results.multi_hand_landmarks[0].landmark],
+        dtype=np.float32,
+    )
+
+
+def extract_landmarks_parallel(
+    video_url: str,
+    max_frames: int | None = None,
+    workers: int | None = None,
+    chunk_frames: int = 64,
+) -> np.ndarray:
+    """
+    Offline variant of extract_landmarks that fans frames out to a process
+    pool. Frames are independent in batch extraction, so throughput scales
+    with cores up to the codec/IO limit; decode still overlaps compute via
+    the threaded capture. Frame order is preserved.
+    """
+    cap = VideoCaptureThreading(video_url)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video source: {video_url}")
+
+    collected: List[np.ndarray] = []
+    frame_count = 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as ex:
+            chunk: List[np.ndarray] = []
+            while True:
+                ret, frame = cap.read()
+                if ret:
+                    chunk.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                    frame_count += 1
+
+                done = not ret or (max_frames and frame_count >= max_frames)
+                if chunk and (done or len(chunk) == chunk_frames):
+                    for result in ex.map(_worker_process_frame, chunk, chunksize=8):
+                        if result is not None:
+                            collected.append(result)
+                    chunk = []
+                if done:
+                    break
     finally:
         cap.release()
-        cv2.destroyAllWindows()
 
-    return frames
+    if not collected:
+        return np.empty((0, NUM_HAND_LANDMARKS, 3), dtype=np.float32)
+    return np.stack(collected)
 
 
-def average_landmarks(frames: List[List[Dict[str, float]]]) -> List[Dict[str, float]]:
-    if not frames:
-        return []
+def average_landmarks(frames: np.ndarray) -> np.ndarray:
+    if not len(frames):
+        return np.empty((0, 3), dtype=np.float32)
 
-    num_points = len(frames[0])
-    accum = np.zeros((num_points, 3), dtype=np.float64)
+    # Single vectorized reduction over the frame axis.
+    return frames.mean(axis=0)
 
-    for frame in frames:
-        for point in frame:
-            accum[point["id"]] += np.array([point["x"], point["y"], point["z"]])
 
-    averages = []
-    for idx in range(num_points):
-        avg = accum[idx] / len(frames)
-        averages.append({"id": idx, "x": float(avg[0]), "y": float(avg[1]), "z": float(avg[2])})
-    return averages
+def landmarks_to_dicts(points: np.ndarray) -> List[Dict[str, float]]:
+    """Convert an (N, 3) array back to the id/x/y/z dict form used in JSON files."""
+    return [
+        {"id": idx, "x": float(x), "y": float(y), "z": float(z)}
+        for idx, (x, y, z) in enumerate(points)
+    ]
 
 
-def save_landmarks(sign: str, video_url: str, frames: List[List[Dict[str, float]]], averages: List[Dict[str, float]]) -> Path:
+def save_landmarks(sign: str, video_url: str, frames: np.ndarray, averages: np.ndarray) -> Path:
     payload = {
         "sign": sign,
         "alias": sign.lower(),
         "video": video_url,
         "frames_sampled": len(frames),
-        "average": averages,
-        "frames": frames[:50],  # keep sample subset to avoid huge files
+        "average": landmarks_to_dicts(averages),
+        "frames": [landmarks_to_dicts(frame) for frame in frames[:50]],  # keep sample subset to avoid huge files
     }
 
     out_path = DATA_DIR / f"{sign.lower()}_landmarks.json"
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    out_path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
     return out_path
 
 
+def build_template_pack() -> Path:
+    """
+    Bundle the averages from every *_landmarks.json into data/templates.npz
+    (labels: (L,), averages: (L, N, 3) float32). The server and classifier
+    memory-map this pack instead of parsing JSON; the per-sign JSON files
+    remain as the build input.
+    """
+    labels: List[str] = []
+    averages: List[np.ndarray] = []
+    for json_file in sorted(DATA_DIR.glob("*_landmarks.json")):
+        payload = orjson.loads(json_file.read_bytes())
+        alias = (payload.get("alias") or payload.get("sign")).lower()
+        labels.append(alias)
+        averages.append(template_store.points_to_array(payload.get("average", [])))
+
+    if not labels:
+        raise RuntimeError(f"No *_landmarks.json files found in {DATA_DIR}")
+
+    # Quantize to int16: landmark coordinates are normalized, so a 1/32767
+    # step (~3e-5) sits far below MediaPipe's own landmark noise, and the
+    # pack halves against float32. The loader dequantizes by dtype.
+    stacked = np.clip(np.stack(averages), -1.0, 1.0)
+    np.savez(
+        template_store.TEMPLATE_PACK,
+        labels=np.array(labels),
+        averages=np.round(stacked * 32767.0).astype(np.int16),
+    )
+    return template_store.TEMPLATE_PACK
+
+
 def main():
     parser = argparse.ArgumentParser(description="Extract MediaPipe hand landmarks from a sign-language dictionary video.")
-    parser.add_argument("--sign", required=True, help="Sign label, e.g. hello")
-    parser.add_argument("--video", required=True, help="Video URL to process")
+    parser.add_argument("--sign", help="Sign label, e.g. hello")
+    parser.add_argument("--video", help="Video URL to process")
     parser.add_argument("--max-frames", type=int, default=None, help="Optional frame limit for quicker experiments")
+    parser.add_argument("--build-pack", action="store_true", help="Rebuild data/templates.npz from existing landmark files and exit")
+    parser.add_argument("--preview", action="store_true", help="Show the capture window with landmark overlay (slower)")
+    parser.add_argument("--workers", type=int, default=0, help="Process frames on N worker processes (0 = serial)")
     args = parser.parse_args()
 
-    frames = extract_landmarks(args.video, args.max_frames)
-    if not frames:
+    if args.preview and args.workers:
+        parser.error("--preview only works with the serial path; drop --workers")
+
+    if args.build_pack:
+        print(f"Wrote template pack to {build_template_pack()}")
+        return
+    if not args.sign or not args.video:
+        parser.error("--sign and --video are required unless --build-pack is given")
+
+    if args.workers:
+        frames = extract_landmarks_parallel(args.video, args.max_frames, workers=args.workers)
+    else:
+        frames = extract_landmarks(args.video, args.max_frames, preview=args.preview)
+    if not len(frames):
         raise RuntimeError("No landmarks detected; check video URL or adjust detection thresholds.")
 
     averages = average_landmarks(frames)
     out_path = save_landmarks(args.sign, args.video, frames, averages)
     print(f"Saved landmark data to {out_path}")
 
+    # Keep the packed templates in sync so a stale pack never shadows new signs.
+    if template_store.TEMPLATE_PACK.exists():
+        print(f"Updated template pack at {build_template_pack()}")
+
 
 if __name__ == "__main__":
     main()
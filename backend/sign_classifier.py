@@ -6,27 +6,59 @@ a proper ML pipeline, but gives a quick baseline for experimentation.
 
 from __future__ import annotations
 
-import json
+import math
 from pathlib import Path
 from typing import Dict, List
 
-from math import sqrt
+import numpy as np
+import orjson
+
+try:
+    from . import templates as template_store
+except ImportError:  # run as a plain script from the backend directory
+    import templates as template_store
+
+try:  # optional: JIT-compiled scorer when numba is installed
+    import numba
+except ImportError:
+    numba = None
+
+points_to_array = template_store.points_to_array
 
 DATA_DIR = Path(__file__).parent / "data"
 
 
-def load_templates() -> Dict[str, List[Dict[str, float]]]:
-    templates: Dict[str, List[Dict[str, float]]] = {}
-    for json_file in DATA_DIR.glob("*_landmarks.json"):
-        with json_file.open(encoding="utf-8") as f:
-            payload = json.load(f)
-            alias = payload.get("alias") or payload.get("sign")
-            templates[alias.lower()] = payload.get("average", [])
-    return templates
+def load_templates() -> Dict[str, np.ndarray]:
+    """Return the shared template cache; parsed from disk on first use only."""
+    return template_store.get_averages()
+
+
+if numba is not None:
 
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def _score_all(points: np.ndarray, stacked: np.ndarray) -> np.ndarray:
+        """Mean point distance of (N, 3) points to each (L, N, 3) template."""
+        n_labels, n_points = stacked.shape[0], stacked.shape[1]
+        scores = np.empty(n_labels, dtype=np.float32)
+        for i in numba.prange(n_labels):
+            total = 0.0
+            for j in range(n_points):
+                dx = points[j, 0] - stacked[i, j, 0]
+                dy = points[j, 1] - stacked[i, j, 1]
+                dz = points[j, 2] - stacked[i, j, 2]
+                total += math.sqrt(dx * dx + dy * dy + dz * dz)
+            scores[i] = total / n_points
+        return scores
 
-def euclidean_distance(p1: Dict[str, float], p2: Dict[str, float]) -> float:
-    return sqrt((p1["x"] - p2["x"]) ** 2 + (p1["y"] - p2["y"]) ** 2 + (p1.get("z", 0.0) - p2.get("z", 0.0)) ** 2)
+    # Warm the JIT once at import so the first real request does not pay
+    # compile latency.
+    _score_all(np.zeros((1, 3), np.float32), np.zeros((1, 1, 3), np.float32))
+
+else:
+
+    def _score_all(points: np.ndarray, stacked: np.ndarray) -> np.ndarray:
+        """Mean point distance of (N, 3) points to each (L, N, 3) template."""
+        return np.linalg.norm(points[None] - stacked, axis=2).mean(axis=1)
 
 
 def classify(landmarks: List[Dict[str, float]]) -> str | None:
@@ -34,29 +66,29 @@ def classify(landmarks: List[Dict[str, float]]) -> str | None:
     if not templates or not landmarks:
         return None
 
-    best_label = None
-    best_score = float("inf")
-
-    for label, template in templates.items():
-        if len(template) != len(landmarks):
-            continue
-        score = sum(euclidean_distance(landmarks[i], template[i]) for i in range(len(template))) / len(template)
-        if score < best_score:
-            best_score = score
-            best_label = label
+    points = points_to_array(landmarks)
+    labels = [label for label, template in templates.items() if len(template) == len(points)]
+    if not labels:
+        return None
 
-    return best_label
+    # One scoring pass over all comparable templates at once.
+    stacked = np.ascontiguousarray(np.stack([templates[label] for label in labels]))
+    scores = _score_all(points, stacked)
+    return labels[int(np.argmin(scores))]
 
 
 def export_dataset(out_path: Path, limit_frames: int | None = None) -> None:
     """
     Merge all *_landmarks.json files into a single dataset file that can
-    be used for external training.
+    be used for external training. Rows are written to disk as they are
+    flattened, one source file at a time, so memory stays flat no matter
+    how many frames the dataset grows to.
     """
-    rows = []
-    for json_file in DATA_DIR.glob("*_landmarks.json"):
-        with json_file.open(encoding="utf-8") as f:
-            payload = json.load(f)
+    count = 0
+    with out_path.open("wb") as f:
+        f.write(b"[\n")
+        for json_file in DATA_DIR.glob("*_landmarks.json"):
+            payload = orjson.loads(json_file.read_bytes())
             alias = payload.get("alias") or payload.get("sign")
             frames = payload.get("frames", [])
             if limit_frames:
@@ -67,11 +99,12 @@ def export_dataset(out_path: Path, limit_frames: int | None = None) -> None:
                     row[f"x_{point['id']}"] = point["x"]
                     row[f"y_{point['id']}"] = point["y"]
                     row[f"z_{point['id']}"] = point.get("z", 0.0)
-                rows.append(row)
-
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(rows, f, ensure_ascii=False, indent=2)
-    print(f"Exported {len(rows)} samples to {out_path}")
+                if count:
+                    f.write(b",\n")
+                f.write(orjson.dumps(row))
+                count += 1
+        f.write(b"\n]\n")
+    print(f"Exported {count} samples to {out_path}")
 
 
 if __name__ == "__main__":
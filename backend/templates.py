@@ -0,0 +1,70 @@
+"""
+Shared in-memory cache of sign landmark templates.
+
+Both the FastAPI endpoints in main.py and the nearest-centroid classifier
+read the same backend/data/*_landmarks.json files. This module parses them
+once, keeps the raw payloads plus ndarray-backed averages in RAM, and only
+touches the disk again on an explicit refresh() — instead of re-globbing
+and re-parsing the directory on every request.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import orjson
+
+DATA_DIR = Path(__file__).parent / "data"
+TEMPLATE_PACK = DATA_DIR / "templates.npz"
+
+_PAYLOAD_CACHE: Dict[str, dict] | None = None
+_AVERAGE_CACHE: Dict[str, np.ndarray] | None = None
+
+
+def points_to_array(points: List[Dict[str, float]]) -> np.ndarray:
+    """Stack id/x/y/z landmark dicts into an (N, 3) float32 array."""
+    return np.array(
+        [(p["x"], p["y"], p.get("z", 0.0)) for p in points],
+        dtype=np.float32,
+    ).reshape(-1, 3)
+
+
+def refresh() -> None:
+    """Re-read every *_landmarks.json from disk and rebuild the caches."""
+    global _PAYLOAD_CACHE, _AVERAGE_CACHE
+    payloads: Dict[str, dict] = {}
+    averages: Dict[str, np.ndarray] = {}
+    for json_file in DATA_DIR.glob("*_landmarks.json"):
+        payload = orjson.loads(json_file.read_bytes())
+        alias = (payload.get("alias") or payload.get("sign")).lower()
+        payloads[alias] = payload
+        averages[alias] = points_to_array(payload.get("average", []))
+
+    # Prefer the packed float32 array when it exists: memory-mapped, no JSON
+    # parse, and already in the layout the classifier broadcasts over.
+    if TEMPLATE_PACK.exists():
+        pack = np.load(TEMPLATE_PACK, mmap_mode="r")
+        packed = pack["averages"]
+        if packed.dtype == np.int16:
+            # Quantized pack: dequantize back to float32 in one pass.
+            packed = packed.astype(np.float32) / 32767.0
+        averages = {str(label): packed[i] for i, label in enumerate(pack["labels"])}
+
+    _PAYLOAD_CACHE = payloads
+    _AVERAGE_CACHE = averages
+
+
+def get_payload(sign: str) -> dict | None:
+    """Return the full JSON payload for a sign, loading the cache lazily."""
+    if _PAYLOAD_CACHE is None:
+        refresh()
+    return _PAYLOAD_CACHE.get(sign.lower())
+
+
+def get_averages() -> Dict[str, np.ndarray]:
+    """Return {alias: (N, 3) float32 average} for every known sign."""
+    if _AVERAGE_CACHE is None:
+        refresh()
+    return _AVERAGE_CACHE
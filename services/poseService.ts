@@ -5,13 +5,24 @@ export interface PosePredictionResponse {
   text: string;
 }
 
+function base64ToBytes(base64: string): Uint8Array {
+  const binary = atob(base64);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes;
+}
+
 export async function analyzePose(imageBase64: string): Promise<PosePredictionResponse> {
+  // Post the raw JPEG bytes; the base64 JSON envelope costs ~33% more
+  // bandwidth and the backend only keeps it as a fallback.
   const response = await fetch(DEFAULT_API_URL, {
     method: 'POST',
     headers: {
-      'Content-Type': 'application/json',
+      'Content-Type': 'application/octet-stream',
     },
-    body: JSON.stringify({ image: imageBase64 }),
+    body: base64ToBytes(imageBase64),
   });
 
   if (!response.ok) {